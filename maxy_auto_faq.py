@@ -2,7 +2,7 @@
 Maxy Auto-FAQ Bot (single-file)
 - Plain text replies (no embeds)
 - Admin FAQ management
-- JSON storage (faqs.json, config.json)
+- msgpack FAQ storage (faqs.mp, migrated from faqs.json), JSON config (config.json)
 - Uses .env for token and owner/guild config
 """
 
@@ -10,11 +10,25 @@ import discord
 from discord.ext import commands, tasks
 from discord import app_commands
 import os
-import json
+import io
+import orjson
+import msgpack
+import copy
+import re
 import random
-from difflib import SequenceMatcher
+import asyncio
+import math
+import functools
+import itertools
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from rapidfuzz import fuzz, process, utils
 from dotenv import load_dotenv
-from typing import Optional
+from types import MappingProxyType
+from typing import Mapping, NamedTuple, Optional
 
 # ---------- Config / Environment ----------
 load_dotenv()
@@ -26,80 +40,410 @@ if not DISCORD_TOKEN:
     raise RuntimeError("Please set DISCORD_TOKEN in .env")
 
 # Files
-FAQ_FILE = "faqs.json"
+FAQ_FILE = "faqs.json"  # legacy format, migrated to faqs.mp (and renamed) on first load
+FAQ_FILE_BIN = "faqs.mp"
 CONFIG_FILE = "config.json"
+COMMAND_SIG_FILE = ".command_sig"  # hash of the last slash-command payload synced to Discord
 
 # Matching threshold (0-1). Lower = more permissive matches.
 DEFAULT_SIMILARITY_THRESHOLD = 0.60
 
-# Fallback messages (bot will choose one randomly when no good match)
+# Recently seen messages remember their match result so repeats skip fuzzy scoring.
+# Only exact repeats (after normalizing) hit; reworded or reordered versions of a question
+# go through the matcher again, which is a fraction of a millisecond per message.
+MATCH_CACHE_SIZE = 4096
+MATCH_CACHE_TTL = 7 * 24 * 60 * 60  # seconds
+
+# Messages outside this length range are never treated as questions ("ok", "lol", walls of text)
+MIN_QUESTION_LENGTH = 4
+MAX_QUESTION_LENGTH = 500
+
+# FAQ sets of at least PRUNE_MIN_KEYS questions are pre-filtered with an inverted index of
+# 3-character shingles before fuzzy scoring. Shingles found in more than TRIGRAM_MAX_DF of
+# the keys ("how", " do ") say nothing about which FAQ is meant and are left out, and a key
+# is only scored if it shares at least TRIGRAM_MIN_OVERLAP of the message's indexed shingles.
+PRUNE_MIN_KEYS = 1000
+TRIGRAM_MAX_DF = 0.10
+TRIGRAM_MIN_OVERLAP = 0.1
+
+# Fallback messages (bot rotates through them in shuffled order when no good match)
 FALLBACK_MESSAGES = [
     "Hmm, I don’t have an answer for that yet. Could you try rephrasing?",
     "I’m not sure about that — maybe check `/faq list` or ask a staff member.",
     "That one’s new to me 👀 — want me to tell the team to add this question?",
     "I couldn’t find anything on that, sorry! You can open a ticket or ask staff.",
 ]
+if not FALLBACK_MESSAGES:
+    raise RuntimeError("FALLBACK_MESSAGES must contain at least one message")
 
 # Channels where the bot answers automatically.
 # Stored in config.json as { "faq_channels": [<channel_id>, ...], "threshold": 0.6 }
 # If empty list, the bot will not auto-reply anywhere until a channel is set.
 
 
-# ---------- Utilities: JSON storage ----------
+# ---------- Utilities: storage ----------
+def _backup_corrupt(path):
+    try:
+        os.rename(path, path + ".bak")
+    except Exception:
+        pass
+
+
+def _atomic_write(path, payload: bytes):
+    # Write to a temp file and swap it in, so a crash mid-write never leaves a truncated file
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(payload)
+    os.replace(tmp, path)
+
+
 def load_json(path, default):
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
     except FileNotFoundError:
         return default
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         # If file corrupted, back it up and return default
-        try:
-            os.rename(path, path + ".bak")
-        except Exception:
-            pass
+        _backup_corrupt(path)
         return default
 
 
-def save_json(path, data):
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+def save_json(path, data, indent=True):
+    _atomic_write(path, orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0))
+
+
+def save_faqs(data):
+    _atomic_write(FAQ_FILE_BIN, msgpack.packb(data))
+
+
+def load_faqs() -> dict:
+    try:
+        with open(FAQ_FILE_BIN, "rb") as f:
+            data = msgpack.unpackb(f.read())
+        if isinstance(data, dict):
+            return data
+        _backup_corrupt(FAQ_FILE_BIN)
+        return {}
+    except FileNotFoundError:
+        pass
+    except (ValueError, msgpack.UnpackException):
+        # Same as corrupt JSON: back it up and start empty. The pre-migration
+        # faqs.json is deliberately not used, it would silently bring back stale FAQs.
+        _backup_corrupt(FAQ_FILE_BIN)
+        return {}
+    # No msgpack store yet: migrate the old faqs.json once, then move it out of the way
+    if not os.path.exists(FAQ_FILE):
+        return {}
+    data = load_json(FAQ_FILE, {})
+    save_faqs(data)
+    if os.path.exists(FAQ_FILE):  # a corrupt one was already moved to .bak by load_json
+        os.replace(FAQ_FILE, FAQ_FILE + ".migrated")
+    return data
 
 
 # Initialize storage
-faqs = load_json(FAQ_FILE, {})  # dict: question -> answer
+faqs = load_faqs()  # dict: question -> answer
 config = load_json(CONFIG_FILE, {"faq_channels": [], "threshold": DEFAULT_SIMILARITY_THRESHOLD})
 
+# Set view of config["faq_channels"] for the per-message membership test
+_faq_channels_set: frozenset[int] = frozenset(config.get("faq_channels", []))
+
+
+def _rebuild_channel_set():
+    """Refresh _faq_channels_set. Call after every change to config["faq_channels"]."""
+    global _faq_channels_set
+    _faq_channels_set = frozenset(config.get("faq_channels", []))
+
+
+# Commands only flag what changed; _flush_state writes it out every couple of seconds,
+# so bursts of edits collapse into one write and disk I/O stays off the event loop.
+_faqs_dirty = False
+_config_dirty = False
+
+
+def mark_faqs_dirty():
+    global _faqs_dirty
+    _faqs_dirty = True
+
+
+def mark_config_dirty():
+    global _config_dirty
+    _config_dirty = True
+
+
+async def flush_state():
+    """Write pending FAQ/config changes to disk in a worker thread."""
+    global _faqs_dirty, _config_dirty
+    # Each flag is cleared before writing (so edits made during the write re-mark it) and
+    # restored unless the write finished. Errors are logged, not raised, so they never
+    # stop the _flush_state loop.
+    if _faqs_dirty:
+        _faqs_dirty = False
+        saved = False
+        try:
+            # Copy on the loop thread so commands can keep mutating while we write
+            await asyncio.to_thread(save_faqs, dict(faqs))
+            saved = True
+        except Exception as e:
+            print("Saving FAQs failed:", e)
+        finally:
+            if not saved:
+                _faqs_dirty = True
+    if _config_dirty:
+        _config_dirty = False
+        saved = False
+        try:
+            await asyncio.to_thread(save_json, CONFIG_FILE, copy.deepcopy(config))
+            saved = True
+        except Exception as e:
+            print("Saving config failed:", e)
+        finally:
+            if not saved:
+                _config_dirty = True
+
+
+def flush_state_sync():
+    """Blocking flush for shutdown, once the event loop is gone."""
+    global _faqs_dirty, _config_dirty
+    if _faqs_dirty:
+        save_faqs(faqs)
+        _faqs_dirty = False
+    if _config_dirty:
+        save_json(CONFIG_FILE, config)
+        _config_dirty = False
+
+
+@tasks.loop(seconds=2)
+async def _flush_state():
+    await flush_state()
+
 
 # ---------- Helper functions ----------
+_WS_RE = re.compile(r"\s+")
+
+
+@functools.lru_cache(maxsize=4096)
 def normalize_text(s: str) -> str:
     # Lowercase, strip, remove excessive spaces and punctuation that users commonly add.
-    return " ".join(s.lower().strip().split())
+    # Cached: the same messages and FAQ keys come through here over and over.
+    return _WS_RE.sub(" ", s.strip()).casefold()
+
+
+def trigrams(s: str) -> set[str]:
+    return {s[i:i + 3] for i in range(len(s) - 2)}
+
+
+def choice_value(key: str) -> str:
+    # Autocomplete values are capped at 100 chars; longer questions go by a stable id
+    if len(key) <= 100:
+        return key
+    return "#" + hashlib.blake2b(key.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class FaqSnapshot(NamedTuple):
+    """
+    Read-only view of the FAQs plus everything derived from them for matching.
+    Admin commands build a new one and swap it in; readers (including worker threads)
+    grab `_snapshot` once and only read through it, without locking, so an edit can't
+    change data mid-scan.
+    """
+    generation: int  # bumped on every rebuild; keys the match cache
+    answers: Mapping[str, str]  # question -> answer, frozen copy of `faqs`
+    orig_keys: tuple[str, ...]  # orig_keys[i] is the stored question whose normalized form is norm_keys[i]
+    norm_keys: tuple[str, ...]
+    proc_keys: tuple[str, ...]  # utils.default_process(norm_keys[i]); what the fuzzy scorer compares
+    norm_to_orig: Mapping[str, str]  # first one wins if two questions normalize the same
+    # 3-char shingle of proc_keys -> read-only int32 array of the indices of keys containing it.
+    # Empty below PRUNE_MIN_KEYS.
+    trigram_index: Mapping[str, np.ndarray]
+    long_key_ids: Mapping[str, str]  # choice_value(key) -> key, for questions over 100 chars
+
+
+_snapshot_generation = itertools.count()
+
+
+def _build_snapshot(data: dict) -> FaqSnapshot:
+    orig_keys = tuple(data.keys())
+    norm_keys = tuple(normalize_text(k) for k in orig_keys)
+    proc_keys = tuple(utils.default_process(k) for k in norm_keys)
+    norm_to_orig = {}
+    for orig, norm in zip(orig_keys, norm_keys):
+        norm_to_orig.setdefault(norm, orig)
+    trigram_index = {}
+    if len(proc_keys) >= PRUNE_MIN_KEYS:
+        postings = {}
+        for i, proc in enumerate(proc_keys):
+            for gram in trigrams(proc):
+                postings.setdefault(gram, []).append(i)
+        max_df = TRIGRAM_MAX_DF * len(proc_keys)
+        for gram, idxs in postings.items():
+            if len(idxs) <= max_df:
+                arr = np.array(idxs, dtype=np.int32)
+                arr.setflags(write=False)
+                trigram_index[gram] = arr
+    return FaqSnapshot(
+        generation=next(_snapshot_generation),
+        answers=MappingProxyType(dict(data)),
+        orig_keys=orig_keys,
+        norm_keys=norm_keys,
+        proc_keys=proc_keys,
+        norm_to_orig=MappingProxyType(norm_to_orig),
+        trigram_index=MappingProxyType(trigram_index),
+        long_key_ids=MappingProxyType({choice_value(k): k for k in orig_keys if len(k) > 100}),
+    )
+
+
+_snapshot: FaqSnapshot = _build_snapshot({})
+
+
+def _rebuild_norm_cache():
+    """Rebuild the matching snapshot. Call after every change to `faqs`."""
+    global _snapshot
+    _snapshot = _build_snapshot(faqs)  # single rebind; readers see the old or new one, never a mix
+    invalidate_faq_list()
+
+
+# (snapshot generation, normalized message) -> (matched key or None, score, threshold used,
+# time stored); oldest entries first. Keying on the generation means a result computed
+# against an old snapshot can never be served for a newer one, so a late write from a
+# thread still scoring the old snapshot can't leak a removed key. Entries from old
+# generations just age out of the LRU.
+_match_cache: "OrderedDict[tuple[int, str], tuple[Optional[str], float, float, float]]" = OrderedDict()
+# The cache is the only mutable state shared between worker threads, hence the lock
+_match_cache_lock = threading.Lock()
+
+
+def _cache_get(snap: FaqSnapshot, msg_norm: str, threshold: float):
+    ck = (snap.generation, msg_norm)
+    with _match_cache_lock:
+        entry = _match_cache.get(ck)
+        if entry is None:
+            return None
+        if entry[2] != threshold or time.monotonic() - entry[3] > MATCH_CACHE_TTL:
+            del _match_cache[ck]
+            return None
+        _match_cache.move_to_end(ck)
+        return entry
+
+
+def _cache_put(snap: FaqSnapshot, msg_norm: str, key: Optional[str], score: float, threshold: float):
+    ck = (snap.generation, msg_norm)
+    with _match_cache_lock:
+        _match_cache[ck] = (key, score, threshold, time.monotonic())
+        _match_cache.move_to_end(ck)
+        if len(_match_cache) > MATCH_CACHE_SIZE:
+            _match_cache.popitem(last=False)
+
+
+# "- question" lines shown by faq_list; built on first use after each FAQ change
+_faq_list_cache: Optional[str] = None
+
+
+def invalidate_faq_list():
+    global _faq_list_cache
+    _faq_list_cache = None
+
+
+def faq_list_text() -> str:
+    global _faq_list_cache
+    if _faq_list_cache is None:
+        _faq_list_cache = "\n".join(f"- {k}" for k in faqs)
+    return _faq_list_cache
+
+
+def faq_list_file(display: str) -> discord.File:
+    # Stream from memory; no temp file to write and clean up
+    return discord.File(io.BytesIO(display.encode("utf-8")), filename="faqs_export.txt")
+
+
+_rebuild_norm_cache()
 
 
 def best_faq_match(message: str):
     """
     Returns (best_key, best_answer, score) if above threshold, else (None, None, best_score).
-    Uses SequenceMatcher ratio for similarity.
+    Uses rapidfuzz's ratio (C++ Levenshtein kernel) for similarity.
+    Safe to call from worker threads: everything is read from one snapshot.
     """
+    snap = _snapshot
     msg_norm = normalize_text(message)
-    best_key = None
-    best_score = 0.0
 
-    for key in faqs.keys():
-        key_norm = normalize_text(key)
-        # Compute similarity on raw strings
-        score = SequenceMatcher(None, msg_norm, key_norm).ratio()
-        if score > best_score:
-            best_score = score
-            best_key = key
+    # Fast path: message is (after normalizing) exactly a stored question
+    hit = snap.norm_to_orig.get(msg_norm)
+    if hit is not None:
+        return hit, snap.answers[hit], 1.0
 
     threshold = config.get("threshold", DEFAULT_SIMILARITY_THRESHOLD)
-    if best_score >= threshold and best_key is not None:
-        return best_key, faqs[best_key], best_score
+
+    # Someone already asked this exact thing recently
+    cached = _cache_get(snap, msg_norm, threshold)
+    if cached is not None:
+        key, score = cached[0], cached[1]
+        if key is None:
+            return None, None, score
+        return key, snap.answers[key], score
+
+    if not snap.proc_keys:
+        _cache_put(snap, msg_norm, None, 0.0, threshold)
+        return None, None, 0.0
+    msg_proc = utils.default_process(msg_norm)
+
+    # Large FAQ sets: only score keys sharing enough distinctive shingles with the message.
+    # A message with no indexed shingles gives nothing to prune on and is scored against
+    # every key; one that matches no key well enough has no plausible answer.
+    candidates = None
+    if snap.trigram_index:
+        postings = [snap.trigram_index[g] for g in trigrams(msg_proc) if g in snap.trigram_index]
+        if postings:
+            shared = np.bincount(np.concatenate(postings), minlength=len(snap.proc_keys))
+            need = max(1, math.ceil(TRIGRAM_MIN_OVERLAP * len(postings)))
+            candidates = np.flatnonzero(shared >= need)
+            if not len(candidates):
+                _cache_put(snap, msg_norm, None, 0.0, threshold)
+                return None, None, 0.0
+    keys = snap.proc_keys if candidates is None else [snap.proc_keys[i] for i in candidates]
+
+    # Score the candidates in one vectorized call (multi-threaded inside rapidfuzz).
+    # Keys were run through default_process when the snapshot was built, so only the
+    # message needs it here. Scores under the cutoff come back as 0; the cutoff also
+    # lets rapidfuzz bail out early on pairs whose lengths alone rule them out, so
+    # there's no separate length pre-filter here.
+    scores = process.cdist(
+        [msg_proc],
+        keys,
+        scorer=fuzz.ratio,
+        processor=None,
+        score_cutoff=threshold * 100,
+        workers=-1,
+        dtype=np.uint8,
+    )[0]
+    best = int(scores.argmax())
+    best_score = float(scores[best]) / 100.0
+
+    if best_score >= threshold and best_score > 0:
+        best_key = snap.orig_keys[best if candidates is None else int(candidates[best])]
+        _cache_put(snap, msg_norm, best_key, best_score, threshold)
+        return best_key, snap.answers[best_key], best_score
+    _cache_put(snap, msg_norm, None, best_score, threshold)
     return None, None, best_score
 
 
+def _fallback_cycle():
+    # Each round goes through every message once in a fresh shuffled order, and a
+    # round never starts with the message the previous one ended on.
+    last = None
+    while True:
+        order = random.sample(FALLBACK_MESSAGES, len(FALLBACK_MESSAGES))
+        if len(order) > 1 and order[0] == last:
+            order[0], order[-1] = order[-1], order[0]
+        yield from order
+        last = order[-1]
+
+
+_fallback_iter = _fallback_cycle()
+
+
 def is_admin_or_owner(member: discord.Member) -> bool:
     if member is None:
         return False
@@ -112,34 +456,73 @@ def is_admin_or_owner(member: discord.Member) -> bool:
 
 
 # ---------- Bot Setup ----------
-intents = discord.Intents.default()
-intents.message_content = True
-intents.messages = True
+# Only what we use: guild events, guild messages and their content. Admin checks read
+# permissions off the member attached to the message/interaction, so no members intent.
+intents = discord.Intents.none()
 intents.guilds = True
-intents.members = True  # to check admin perms
+intents.guild_messages = True
+intents.message_content = True
 
-bot = commands.Bot(command_prefix="!", intents=intents)
+bot = commands.Bot(
+    command_prefix="!",
+    intents=intents,
+    chunk_guilds_at_startup=False,
+    member_cache_flags=discord.MemberCacheFlags.none(),
+)
 tree = bot.tree  # app_commands tree for slash commands
 
 
 # ---------- Events ----------
+def command_signature(guild: Optional[discord.Object]) -> str:
+    # Hash exactly what tree.sync would upload, plus where it would go (a new token for a
+    # different application must sync even if the commands didn't change)
+    payload = {
+        "application": bot.application_id,
+        "guild": guild.id if guild else None,
+        "commands": [c.to_dict(tree) for c in tree.get_commands(guild=guild)],
+    }
+    return hashlib.blake2b(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+
+def read_command_signature() -> Optional[str]:
+    try:
+        with open(COMMAND_SIG_FILE, "r", encoding="utf-8") as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return None
+
+
 @bot.event
 async def on_ready():
     print(f"Logged in as {bot.user} (ID: {bot.user.id})")
-    # Sync commands (guild if provided for quick availability)
+    # Sync commands (guild if provided for quick availability), but only if they changed
+    # since the last successful sync; syncing is slow and rate limited.
     try:
-        if GUILD_ID_ENV:
-            gid = int(GUILD_ID_ENV)
-            await tree.sync(guild=discord.Object(id=gid))
-            print(f"Synced slash commands to guild {gid}")
+        guild = discord.Object(id=int(GUILD_ID_ENV)) if GUILD_ID_ENV else None
+        sig = command_signature(guild)
+        if sig == read_command_signature():
+            print("Slash commands unchanged; skipping sync.")
         else:
-            await tree.sync()
-            print("Synced global slash commands (may take up to an hour to appear).")
+            await tree.sync(guild=guild)
+            with open(COMMAND_SIG_FILE, "w", encoding="utf-8") as f:
+                f.write(sig)
+            if guild:
+                print(f"Synced slash commands to guild {guild.id}")
+            else:
+                print("Synced global slash commands (may take up to an hour to appear).")
     except Exception as e:
         print("Slash command sync failed:", e)
+    if not _flush_state.is_running():
+        _flush_state.start()
     print("Maxy Auto-FAQ ready.")
 
 
+@bot.event
+async def on_disconnect():
+    # Don't sit on unsaved edits while the connection is down
+    await flush_state()
+
+
 @bot.event
 async def on_message(message: discord.Message):
     # Ignore messages from bots (including itself)
@@ -150,19 +533,27 @@ async def on_message(message: discord.Message):
     if message.guild is None:
         return
 
-    guild_cfg_channels = config.get("faq_channels", [])
-    if not guild_cfg_channels:
+    if not _faq_channels_set:
         # No channels configured: nothing to auto-reply to
         await bot.process_commands(message)
         return
 
-    if message.channel.id not in guild_cfg_channels:
+    if message.channel.id not in _faq_channels_set:
+        await bot.process_commands(message)
+        return
+
+    # Skip commands and chatter that can't be a question
+    content = (message.content or "").strip()
+    if (
+        not content
+        or content.startswith(bot.command_prefix)
+        or not (MIN_QUESTION_LENGTH <= len(content) <= MAX_QUESTION_LENGTH)
+    ):
         await bot.process_commands(message)
         return
 
-    # Try find best FAQ match
-    content = message.content or ""
-    key, answer, score = best_faq_match(content)
+    # Try find best FAQ match (in a worker thread so scoring never stalls the gateway)
+    key, answer, score = await asyncio.to_thread(best_faq_match, content)
 
     if key:
         # Plain text reply (no embed), reply to the user message
@@ -176,8 +567,8 @@ async def on_message(message: discord.Message):
             await message.channel.send(reply_text)
         return
     else:
-        # No strong match -> send a logical fallback (randomized)
-        fallback = random.choice(FALLBACK_MESSAGES)
+        # No strong match -> send a logical fallback (rotated)
+        fallback = next(_fallback_iter)
         try:
             await message.reply(fallback, mention_author=False)
         except discord.Forbidden:
@@ -198,42 +589,50 @@ def admin_check(interaction: discord.Interaction) -> bool:
     return False
 
 
+def admin_only():
+    # Failing checks raise app_commands.CheckFailure, answered once in on_app_command_error
+    return app_commands.check(admin_check)
+
+
+@tree.error
+async def on_app_command_error(interaction: discord.Interaction, error: app_commands.AppCommandError):
+    if isinstance(error, app_commands.CheckFailure):
+        await interaction.response.send_message("You don't have permission to use this command.", ephemeral=True)
+        return
+    await app_commands.CommandTree.on_error(tree, interaction, error)
+
+
 @tree.command(name="faq_add", description="Add a new FAQ entry")
 @app_commands.describe(question="The question/key users will ask", answer="The plain-text answer the bot should give")
+@admin_only()
 async def faq_add(interaction: discord.Interaction, question: str, answer: str):
-    if not admin_check(interaction):
-        await interaction.response.send_message("You don't have permission to use this command.", ephemeral=True)
-        return
     key = normalize_text(question)
     if key in faqs:
         await interaction.response.send_message("That FAQ already exists. Use `/faq_view` or `/faq_remove`.", ephemeral=True)
         return
     faqs[question] = answer
-    save_json(FAQ_FILE, faqs)
+    mark_faqs_dirty()
+    _rebuild_norm_cache()
     await interaction.response.send_message(f"FAQ added for: {question}", ephemeral=True)
 
 
 @tree.command(name="faq_remove", description="Remove an FAQ entry")
 @app_commands.describe(question="The exact question/key to remove")
+@admin_only()
 async def faq_remove(interaction: discord.Interaction, question: str):
-    if not admin_check(interaction):
-        await interaction.response.send_message("You don't have permission to use this command.", ephemeral=True)
-        return
     # try removing by exact key, otherwise try normalized match
     if question in faqs:
         del faqs[question]
-        save_json(FAQ_FILE, faqs)
+        mark_faqs_dirty()
+        _rebuild_norm_cache()
         await interaction.response.send_message(f"Removed FAQ: {question}", ephemeral=True)
         return
     # try normalized search
-    found = None
-    for k in list(faqs.keys()):
-        if normalize_text(k) == normalize_text(question):
-            found = k
-            break
+    found = _snapshot.norm_to_orig.get(normalize_text(question))
     if found:
         del faqs[found]
-        save_json(FAQ_FILE, faqs)
+        mark_faqs_dirty()
+        _rebuild_norm_cache()
         await interaction.response.send_message(f"Removed FAQ: {found}", ephemeral=True)
         return
     await interaction.response.send_message("Could not find that FAQ.", ephemeral=True)
@@ -248,18 +647,10 @@ async def faq_list(interaction: discord.Interaction):
         await interaction.response.send_message("No FAQs have been added yet.", ephemeral=True)
         return
     # Build a compact list (only keys)
-    keys = list(faqs.keys())
-    # chunking if too long
-    display = "\n".join(f"- {k}" for k in keys)
+    display = faq_list_text()
     if len(display) > 1900:
         # send as file if too long
-        with open("faqs_export.txt", "w", encoding="utf-8") as f:
-            f.write(display)
-        await interaction.response.send_message("FAQ list is long — sending as a file.", ephemeral=True, file=discord.File("faqs_export.txt"))
-        try:
-            os.remove("faqs_export.txt")
-        except:
-            pass
+        await interaction.response.send_message("FAQ list is long — sending as a file.", ephemeral=True, file=faq_list_file(display))
         return
     await interaction.response.send_message(f"FAQs:\n{display}", ephemeral=True)
 
@@ -267,62 +658,78 @@ async def faq_list(interaction: discord.Interaction):
 @tree.command(name="faq_view", description="View an FAQ answer")
 @app_commands.describe(question="The question to view (exact or close match)")
 async def faq_view(interaction: discord.Interaction, question: str):
-    # Try exact
+    # Try exact (an autocomplete pick for a long question arrives as its id)
+    question = _snapshot.long_key_ids.get(question, question)
     if question in faqs:
         await interaction.response.send_message(faqs[question], ephemeral=True)
         return
     # otherwise try fuzzy best match
-    best_key, best_answer, score = best_faq_match(question)
+    best_key, best_answer, score = await asyncio.to_thread(best_faq_match, question)
     if best_key:
         await interaction.response.send_message(f"Closest match ({score:.2f}): **{best_key}**\n\n{best_answer}", ephemeral=True)
     else:
         await interaction.response.send_message("No matching FAQ found.", ephemeral=True)
 
 
+@faq_view.autocomplete("question")
+async def faq_view_autocomplete(interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
+    # Suggest the closest stored questions as the user types; picking one makes
+    # faq_view an exact lookup. Discord allows 25 choices, names and values up to 100 chars.
+    snap = _snapshot
+    if not current.strip():
+        keys = snap.orig_keys[:25]
+    else:
+        matches = process.extract(
+            utils.default_process(current),
+            snap.proc_keys,
+            scorer=fuzz.WRatio,
+            processor=None,
+            limit=25,
+        )
+        keys = [snap.orig_keys[idx] for _, _, idx in matches]
+    return [app_commands.Choice(name=k[:100], value=choice_value(k)) for k in keys]
+
+
 # ---------- Config commands ----------
 @tree.command(name="set_faq_channel", description="Set a channel where the bot will auto-reply with FAQs")
 @app_commands.describe(channel="The channel to use for auto-FAQ replies")
+@admin_only()
 async def set_faq_channel(interaction: discord.Interaction, channel: discord.TextChannel):
-    if not admin_check(interaction):
-        await interaction.response.send_message("You don't have permission to use this command.", ephemeral=True)
-        return
     cfg_channels = config.get("faq_channels", [])
     if channel.id in cfg_channels:
         await interaction.response.send_message("That channel is already configured.", ephemeral=True)
         return
     cfg_channels.append(channel.id)
     config["faq_channels"] = cfg_channels
-    save_json(CONFIG_FILE, config)
+    mark_config_dirty()
+    _rebuild_channel_set()
     await interaction.response.send_message(f"Added {channel.mention} to auto-FAQ channels.", ephemeral=True)
 
 
 @tree.command(name="disable_faq_channel", description="Disable auto-FAQ replies in a channel")
 @app_commands.describe(channel="The channel to remove")
+@admin_only()
 async def disable_faq_channel(interaction: discord.Interaction, channel: discord.TextChannel):
-    if not admin_check(interaction):
-        await interaction.response.send_message("You don't have permission to use this command.", ephemeral=True)
-        return
     cfg_channels = config.get("faq_channels", [])
     if channel.id not in cfg_channels:
         await interaction.response.send_message("That channel isn't configured.", ephemeral=True)
         return
     cfg_channels.remove(channel.id)
     config["faq_channels"] = cfg_channels
-    save_json(CONFIG_FILE, config)
+    mark_config_dirty()
+    _rebuild_channel_set()
     await interaction.response.send_message(f"Removed {channel.mention} from auto-FAQ channels.", ephemeral=True)
 
 
 @tree.command(name="set_threshold", description="Set similarity threshold for FAQ matching (0.0 - 1.0)")
 @app_commands.describe(value="A decimal between 0 and 1. Lower = more permissive")
+@admin_only()
 async def set_threshold(interaction: discord.Interaction, value: float):
-    if not admin_check(interaction):
-        await interaction.response.send_message("You don't have permission to use this command.", ephemeral=True)
-        return
     if not (0.0 <= value <= 1.0):
         await interaction.response.send_message("Threshold must be between 0.0 and 1.0", ephemeral=True)
         return
     config["threshold"] = value
-    save_json(CONFIG_FILE, config)
+    mark_config_dirty()
     await interaction.response.send_message(f"Set FAQ similarity threshold to {value:.2f}", ephemeral=True)
 
 
@@ -335,7 +742,8 @@ async def prefix_faq_add(ctx: commands.Context, question: str, *, answer: str):
         await ctx.reply("That FAQ already exists.")
         return
     faqs[question] = answer
-    save_json(FAQ_FILE, faqs)
+    mark_faqs_dirty()
+    _rebuild_norm_cache()
     await ctx.reply(f"FAQ added for: {question}")
 
 
@@ -344,18 +752,16 @@ async def prefix_faq_add(ctx: commands.Context, question: str, *, answer: str):
 async def prefix_faq_remove(ctx: commands.Context, *, question: str):
     if question in faqs:
         del faqs[question]
-        save_json(FAQ_FILE, faqs)
+        mark_faqs_dirty()
+        _rebuild_norm_cache()
         await ctx.reply(f"Removed FAQ: {question}")
         return
     # try normalized match remove
-    found = None
-    for k in list(faqs.keys()):
-        if normalize_text(k) == normalize_text(question):
-            found = k
-            break
+    found = _snapshot.norm_to_orig.get(normalize_text(question))
     if found:
         del faqs[found]
-        save_json(FAQ_FILE, faqs)
+        mark_faqs_dirty()
+        _rebuild_norm_cache()
         await ctx.reply(f"Removed FAQ: {found}")
         return
     await ctx.reply("Could not find that FAQ.")
@@ -366,17 +772,10 @@ async def prefix_faq_list(ctx: commands.Context):
     if not faqs:
         await ctx.reply("No FAQs have been added yet.")
         return
-    keys = list(faqs.keys())
-    display = "\n".join(f"- {k}" for k in keys)
+    display = faq_list_text()
     if len(display) > 1900:
         await ctx.send("FAQ list is long; sending as a file.")
-        with open("faqs_export.txt", "w", encoding="utf-8") as f:
-            f.write(display)
-        await ctx.send(file=discord.File("faqs_export.txt"))
-        try:
-            os.remove("faqs_export.txt")
-        except:
-            pass
+        await ctx.send(file=faq_list_file(display))
         return
     await ctx.reply(f"FAQs:\n{display}")
 
@@ -386,7 +785,7 @@ async def prefix_faq_view(ctx: commands.Context, *, question: str):
     if question in faqs:
         await ctx.reply(faqs[question])
         return
-    best_key, best_answer, score = best_faq_match(question)
+    best_key, best_answer, score = await asyncio.to_thread(best_faq_match, question)
     if best_key:
         await ctx.reply(f"Closest match ({score:.2f}): {best_key}\n\n{best_answer}")
     else:
@@ -395,4 +794,7 @@ async def prefix_faq_view(ctx: commands.Context, *, question: str):
 
 # ---------- Run ----------
 if __name__ == "__main__":
-    bot.run(DISCORD_TOKEN)
+    try:
+        bot.run(DISCORD_TOKEN)
+    finally:
+        flush_state_sync()